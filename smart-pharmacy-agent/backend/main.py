@@ -1,19 +1,35 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Literal
+from fastapi import FastAPI, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from .db import Base, engine, get_db
 from .models import Inventory
 from .schemas import InventoryCreate, InventoryOut
-from .services.forecasting import compute_forecast
 from .services.reorder import reorder_point, reorder_suggestion
-from .services.redistribution import near_expiry_redistribution
-from .services.groq_agent import forecast_with_groq
+from .services.warmup import WARMUP_ON_STARTUP, warm_up
 
-import pandas as pd
-
-app = FastAPI(title="Smart Pharmacy Inventory Agent")
+# pandas-backed services and the Groq client are imported inside the endpoints
+# that need them, so /health and cold starts don't pay for them.
 
 Base.metadata.create_all(bind=engine)
 
+def _load_services():
+    from .services import redistribution, serialization  # noqa: F401
+
+def _load_groq():
+    from .services import groq_agent
+    groq_agent._client()  # imports the groq SDK and caches the client
+
+@asynccontextmanager
+async def lifespan(app):
+    if WARMUP_ON_STARTUP:
+        warm_up(_load_services, _load_groq)
+    yield
+
+app = FastAPI(title="Smart Pharmacy Inventory Agent", lifespan=lifespan)
+
 @app.get("/health")
 def health():
     return {"status":"ok"}
@@ -40,21 +56,55 @@ def reorder(center_id:str, drug:str, demand_std: float|None=None, service_level:
     qty = reorder_suggestion(inv.stock, rpoint, order_multiple=1)
     return {"center_id":center_id, "drug":drug, "reorder_point":rpoint, "suggest_order_qty":qty}
 
+class FastJSONResponse(JSONResponse):
+    """Encodes with orjson (NumPy/pandas types included) and skips jsonable_encoder."""
+    def render(self, content) -> bytes:
+        from .services.serialization import dumps
+        return dumps(content)
+
 @app.post("/redistribute")
-def redistribute():
+def redistribute(format: Literal["json", "ndjson", "csv"] = "json", limit: int|None = Query(None, ge=1), cursor: str|None = None):
+    """Near-expiry redistribution moves.
+    format=json returns a list (or {"items", "next_cursor"} when limit is set);
+    ndjson/csv stream moves as they are produced. limit/cursor paginate every format.
+    A cursor resumes at its move without regenerating earlier ones, and is rejected
+    (400) once the inventory or the date it was issued for has changed.
+    """
+    import pandas as pd
+    from itertools import islice
+    from .services.redistribution import iter_move_positions, moves_version, MOVE_FIELDS
+    from .services.serialization import decode_cursor, iter_ndjson, iter_csv, page
+    try:
+        state = decode_cursor(cursor)
+    except ValueError as e:
+        return FastJSONResponse({"error": str(e)}, status_code=400)
     db = next(get_db())
-    rows = db.query(Inventory).all()
-    inv_df = pd.DataFrame([{
-        'center_id': r.center_id, 'drug': r.drug, 'stock': r.stock, 'expiry_date': r.expiry_date
-    } for r in rows])
+    rows = db.query(Inventory.center_id, Inventory.drug, Inventory.stock, Inventory.expiry_date,
+                    Inventory.avg_daily_demand).order_by(Inventory.id).all()
+    inv_df = pd.DataFrame.from_records(rows, columns=['center_id', 'drug', 'stock', 'expiry_date', 'avg_daily_demand'])
     # fake forecasts: use avg_daily_demand * 7
     demand = { (r.center_id, r.drug): [r.avg_daily_demand]*7 for r in rows }
-    moves = near_expiry_redistribution(inv_df, demand, horizon=7, expiry_days=30)
-    return moves.to_dict(orient='records')
+    today = datetime.utcnow().date()
+    version = moves_version(inv_df, demand, horizon=7, expiry_days=30, today=today)
+    start = (0, 0)
+    if state is not None:
+        if state.get("v") != version or len(state["p"]) != 2:
+            return FastJSONResponse({"error": "stale cursor"}, status_code=400)
+        start = tuple(state["p"])
+    positioned = iter_move_positions(inv_df, demand, horizon=7, expiry_days=30, today=today, start=start)
+    if format == "json" and limit is not None:
+        return FastJSONResponse(page(positioned, limit, version))
+    moves = islice((move for _, move in positioned), limit)
+    if format == "ndjson":
+        return StreamingResponse(iter_ndjson(moves), media_type="application/x-ndjson")
+    if format == "csv":
+        return StreamingResponse(iter_csv(moves, MOVE_FIELDS), media_type="text/csv",
+                                 headers={"Content-Disposition": "attachment; filename=redistribution_moves.csv"})
+    return FastJSONResponse(list(moves))
 
 @app.get("/forecast_groq")
 def forecast_groq(center_id: str, drug: str, horizon: int = 7):
-    import pandas as pd
+    from .services.groq_agent import forecast_with_groq
     db = next(get_db())
     # Build simple history from Inventory avg_daily_demand * 1 for last 14 days as a fallback
     rows = db.query(Inventory).filter_by(center_id=center_id, drug=drug).all()
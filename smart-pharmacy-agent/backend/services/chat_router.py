@@ -0,0 +1,392 @@
+import re
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .forecasting import auto_forecast
+from .reorder import reorder_point, reorder_suggestion
+from .redistribution import near_expiry_redistribution
+
+# Used when the inventory has no `category` column. Keys are matched against the
+# query (singular or plural), values are lower-cased drug names.
+DRUG_CATEGORIES = {
+    "antibiotic": {"amoxicillin", "azithromycin", "ciprofloxacin", "doxycycline", "cephalexin"},
+    "antidiabetic": {"insulin", "metformin", "glimepiride"},
+    "analgesic": {"paracetamol", "ibuprofen", "aspirin", "diclofenac"},
+    "painkiller": {"paracetamol", "ibuprofen", "aspirin", "diclofenac"},
+}
+
+# Rough chars-per-token ratio used to keep the LLM context inside its budget.
+CHARS_PER_TOKEN = 4
+
+# Open-ended questions (reasons, advice, explanations) always go to the LLM.
+LLM_FIRST = re.compile(
+    r"^(why|explain|describe|how (should|can|could|do|does|would|to)|what should|should (we|i)|what happens"
+    r"|what (is|are|'s) (the )?(best|right|ideal|reason|difference|purpose|impact|effect))\b"
+    r"|\bbest way\b|\bwhat should (we|i) do\b"
+)
+
+# A lookup question: asks for a list/amount, or is a bare request like "reorder alerts for X".
+QUESTION_SHAPE = re.compile(
+    r"^(which|what|show|list|give|get|display|find|any|are there|is there|do we have|tell me|how (much|many))\b"
+)
+
+# Checked in order; the first matching intent wins. Patterns are phrases, not topic words.
+INTENT_PATTERNS = [
+    ("expiry", re.compile(r"\bexpir(e|es|ed|ing|y)\b|\bshelf life\b")),
+    ("redistribution", re.compile(r"\bredistribut\w*|\b(transfer|move) suggestions?\b|\bsuggested (moves|transfers)\b|\bsurplus stock\b")),
+    ("reorder", re.compile(r"\breorder (alerts?|suggestions?|list|needs?)\b|\b(need|needs|due) (to be )?(reorder|restock)\w*|\b(order|reorder|restock)\b.*\b(now|today|this week)\b"
+                           r"|\brunning (low|out)\b|\blow (on )?stock\b|\bstock ?outs?\b|\bbelow (the )?reorder point\b")),
+    ("forecast", re.compile(r"\bforecast\w*|\bpredicted (demand|sales|usage)\b|\bexpected (demand|sales|usage)\b")),
+    # Only explicit stock phrases: "how much insulin will we need/sell" is demand, not stock.
+    ("stock", re.compile(r"\bin stock\b|\bon hand\b|\bstock (levels?|of|for|at)\b|\bunits? left\b|\bhow (much|many) stock\b")),
+]
+
+# Intents that only make sense for a named drug/category or center.
+ENTITY_INTENTS = {"stock"}
+
+
+class InventoryIndex:
+    """Precomputed per (center, drug) view of inventory, forecasts and reorder data.
+    inventory_df: columns center_id, drug, stock, avg_daily_demand, lead_time_days, safety_stock, expiry_date
+    history_df: columns date, center_id, drug, qty
+    centers_df: columns center_id, name
+    forecasts: {(center_id, drug): forecast array} over `horizon`, e.g. from a shared
+        auto_forecast run; computed with auto_forecast when omitted
+    """
+
+    def __init__(self, inventory_df: pd.DataFrame, history_df: pd.DataFrame, centers_df: pd.DataFrame,
+                 horizon: int = 7, service_level: float = 0.95, today: Optional[date] = None,
+                 forecasts: Optional[Dict] = None):
+        self.horizon = horizon
+        self.today = pd.Timestamp(today or date.today())
+        self.center_names = dict(zip(centers_df['center_id'], centers_df['name']))
+
+        t = inventory_df.copy()
+        t['expiry_date'] = pd.to_datetime(t['expiry_date'])
+        t['days_to_expiry'] = (t['expiry_date'] - self.today).dt.days
+        t['center_name'] = t['center_id'].map(self.center_names).fillna(t['center_id'])
+        if 'category' not in t.columns:
+            t['category'] = t['drug'].map(_category_for)
+        t['reorder_point'] = [
+            round(reorder_point(r.avg_daily_demand, int(r.lead_time_days), service_level=service_level,
+                                safety_stock=r.safety_stock), 2)
+            for r in t.itertuples()
+        ]
+        t['suggest_order_qty'] = [int(reorder_suggestion(s, rp)) for s, rp in zip(t['stock'], t['reorder_point'])]
+        if forecasts is None:
+            forecasts, _ = auto_forecast(history_df, horizon=horizon)
+        t['forecast_sum'] = [round(float(np.sum(forecasts.get((c, d), 0))), 2) for c, d in zip(t['center_id'], t['drug'])]
+        daily = t['forecast_sum'] / horizon
+        t['days_of_cover'] = np.where(daily > 0, (t['stock'] / daily.where(daily > 0, 1)).round(1), np.inf)
+        self.table = t.reset_index(drop=True)
+
+        self.moves = near_expiry_redistribution(
+            t[['center_id', 'drug', 'stock', 'expiry_date']], forecasts, horizon=horizon, expiry_days=30,
+            today=self.today
+        )
+        self.drugs = sorted(self.table['drug'].unique(), key=len, reverse=True)
+        self.categories = {c for c in self.table['category'].dropna().unique()}
+        # Drug names we recognize even when this inventory holds none of them
+        self.known_drugs = ({d for names in DRUG_CATEGORIES.values() for d in names}
+                            | {str(d).lower() for d in history_df['drug'].unique()}
+                            | {d.lower() for d in self.drugs})
+
+    def match_drugs(self, query: str) -> List[str]:
+        q = query.lower()
+        found = [d for d in self.drugs if d.lower() in q]
+        for cat in self.categories:
+            if re.search(rf"\b{re.escape(cat.lower())}s?\b", q):
+                found += self.table.loc[self.table['category'] == cat, 'drug'].unique().tolist()
+        for cat, names in DRUG_CATEGORIES.items():
+            if re.search(rf"\b{cat}s?\b", q):
+                found += [d for d in self.drugs if d.lower() in names]
+        return sorted(set(found))
+
+    def missing_terms(self, query: str) -> List[str]:
+        """Drug names and categories named in the query that have no inventory rows."""
+        q = query.lower()
+        held = {d.lower() for d in self.drugs}
+        missing = [d for d in sorted(self.known_drugs - held) if re.search(rf"\b{re.escape(d)}\b", q)]
+        for cat, names in DRUG_CATEGORIES.items():
+            if re.search(rf"\b{cat}s?\b", q) and not (names & held):
+                missing.append(cat + "s")
+        return missing
+
+    def has_entity(self, query: str) -> bool:
+        return bool(self.match_drugs(query) or self.match_centers(query) or self.missing_terms(query))
+
+    def match_centers(self, query: str) -> List[str]:
+        q = query.lower()
+        return sorted(cid for cid, name in self.center_names.items()
+                      if re.search(rf"\b{re.escape(cid.lower())}\b", q) or name.lower() in q)
+
+    def select(self, query: str) -> pd.DataFrame:
+        """Rows filtered by the drugs/categories and centers mentioned in the query."""
+        t = self.table
+        drugs, centers = self.match_drugs(query), self.match_centers(query)
+        if drugs:
+            t = t[t['drug'].isin(drugs)]
+        if centers:
+            t = t[t['center_id'].isin(centers)]
+        return t
+
+
+def _category_for(drug: str) -> Optional[str]:
+    d = str(drug).lower()
+    for cat, names in DRUG_CATEGORIES.items():
+        if d in names:
+            return cat
+    return None
+
+
+def detect_intent(query: str) -> Optional[str]:
+    """Local intent for lookup-style questions; None means the LLM should answer."""
+    q = query.lower().strip()
+    if LLM_FIRST.search(q):
+        return None
+    for intent, pattern in INTENT_PATTERNS:
+        if pattern.search(q) and (QUESTION_SHAPE.match(q) or pattern.match(q)):
+            return intent
+    return None
+
+
+MONTHS = {m: i for i, m in enumerate(
+    ["january", "february", "march", "april", "may", "june", "july", "august", "september", "october",
+     "november", "december"], start=1)}
+# Full names or 3-letter abbreviations, optionally followed by a year; "may" only as "in may".
+MONTH_NAME = re.compile(
+    r"\b(?:(january|february|march|april|june|july|august|september|october|november|december"
+    r"|jan|feb|mar|apr|jun|jul|aug|sept?|oct|nov|dec)|(?<=in )(may))\b(?:\s+(\d{4}))?"
+)
+# Any wording that pins down a date range; if we can't parse it, the LLM answers instead.
+TIME_EXPRESSION = re.compile(
+    r"\b(today|tomorrow|yesterday|ago|since|until|till|before|after|during|between|days?|weeks?|weekend|months?"
+    r"|quarter|years?|monday|tuesday|wednesday|thursday|friday|saturday|sunday|\d{4}|\d{1,2}[/-]\d{1,2})\b"
+)
+PAST_TENSE = re.compile(r"\b(expired|last|past|previous)\b")
+
+
+def expiry_window(query: str, today: pd.Timestamp):
+    """Parse the date range asked about as (start, end); start is None for "already expired".
+    Defaults to the next 30 days when the query names no time at all, and returns None when
+    it names one we can't parse.
+    """
+    q = query.lower()
+    today = pd.Timestamp(today).normalize()
+    yesterday = today - timedelta(days=1)
+
+    if "next month" in q:
+        first = (today + pd.offsets.MonthBegin(1)).normalize()
+        return first, first + pd.offsets.MonthEnd(0)
+    if "last month" in q or "previous month" in q:
+        first = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+        return first, first + pd.offsets.MonthEnd(0)
+    if "this month" in q:
+        return today, today + pd.offsets.MonthEnd(0)
+    if "next week" in q or "this week" in q:
+        return today, today + timedelta(days=7)
+    if "last week" in q or "past week" in q:
+        return today - timedelta(days=7), yesterday
+    m = re.search(r"(\d+)\s*(day|week|month)s?", q)
+    if m and not re.search(r"\bago\b", q):
+        n, unit = int(m.group(1)), m.group(2)
+        days = n * {"day": 1, "week": 7, "month": 30}[unit]
+        if re.search(rf"\b(last|past|previous)\s+{m.group(0)}", q):
+            return today - timedelta(days=days), yesterday
+        return today, today + timedelta(days=days)
+    months = MONTH_NAME.findall(q)
+    if len(months) == 1 and not TIME_EXPRESSION.search(MONTH_NAME.sub(" ", q)):
+        abbr, may, year = months[0]
+        month = MONTHS["may"] if may else next(i for name, i in MONTHS.items() if name.startswith(abbr[:3]))
+        if year:
+            year = int(year)
+        elif PAST_TENSE.search(q):
+            year = today.year if month <= today.month else today.year - 1
+        else:
+            year = today.year if month >= today.month else today.year + 1
+        first = pd.Timestamp(year=year, month=month, day=1)
+        return first, first + pd.offsets.MonthEnd(0)
+    if months or TIME_EXPRESSION.search(q):
+        return None
+    if re.search(r"\bexpired\b", q):
+        return None, yesterday
+    return today, today + timedelta(days=30)
+
+
+def _fmt_rows(df: pd.DataFrame, fmt: Callable[[pd.Series], str], limit: int = 15) -> str:
+    lines = [f"- {fmt(r)}" for _, r in df.head(limit).iterrows()]
+    if len(df) > limit:
+        lines.append(f"- … and {len(df) - limit} more")
+    return "\n".join(lines)
+
+
+def _scope(index: InventoryIndex, query: str) -> str:
+    parts = index.match_drugs(query) + [index.center_names[c] for c in index.match_centers(query)]
+    return f" ({', '.join(parts)})" if parts else ""
+
+
+def answer_expiry(index: InventoryIndex, query: str) -> Optional[str]:
+    window = expiry_window(query, index.today)
+    if window is None:
+        return None
+    start, end = window
+    rows = index.select(query)
+    in_window = rows['expiry_date'] <= end
+    if start is not None:
+        in_window &= rows['expiry_date'] >= start
+    hits = rows[in_window].sort_values('expiry_date')
+    if start is None:
+        period = f"before {index.today:%d %b %Y}"
+        heading, none = "Already expired", f"No stock{_scope(index, query)} has expired."
+    else:
+        period = f"{start:%d %b %Y} – {end:%d %b %Y}"
+        past = end < index.today
+        heading = "Expired" if past else "Expiring"
+        none = f"No stock{_scope(index, query)} {'expired' if past else 'expires'} between {period}."
+    if hits.empty:
+        return none
+    msg = f"**{heading} {period}{_scope(index, query)}:**\n" + _fmt_rows(
+        hits, lambda r: f"{r.drug} at {r.center_name}: {r.stock:g} units, expires {r.expiry_date:%d %b %Y}")
+    expired = rows[rows['expiry_date'] < index.today]
+    if end >= index.today and not expired.empty:
+        msg += f"\n\n⚠️ {len(expired)} lot(s) already expired: " + ", ".join(
+            f"{r.drug} @ {r.center_id}" for r in expired.itertuples())
+    return msg
+
+
+def answer_reorder(index: InventoryIndex, query: str) -> str:
+    rows = index.select(query)
+    alerts = rows[rows['suggest_order_qty'] > 0].sort_values('suggest_order_qty', ascending=False)
+    if alerts.empty:
+        return f"No reorder alerts{_scope(index, query)} — all stock is above its reorder point."
+    return f"**Reorder alerts{_scope(index, query)}:**\n" + _fmt_rows(
+        alerts, lambda r: f"{r.drug} at {r.center_name}: stock {r.stock:g} < reorder point {r.reorder_point:g} "
+                          f"→ order {r.suggest_order_qty}")
+
+
+def answer_forecast(index: InventoryIndex, query: str) -> str:
+    rows = index.select(query).sort_values('forecast_sum', ascending=False)
+    if rows.empty:
+        return f"No forecast data{_scope(index, query)}."
+    return f"**{index.horizon}-day demand forecast{_scope(index, query)}:**\n" + _fmt_rows(
+        rows, lambda r: f"{r.drug} at {r.center_name}: {r.forecast_sum:g} units "
+                        f"(stock {r.stock:g}, {r.days_of_cover:g} days of cover)")
+
+
+def answer_stock(index: InventoryIndex, query: str) -> str:
+    rows = index.select(query).sort_values(['drug', 'center_id'])
+    if rows.empty:
+        return f"No inventory records{_scope(index, query)}."
+    total = rows.groupby('drug')['stock'].sum()
+    summary = ", ".join(f"{d}: {s:g}" for d, s in total.items())
+    return f"**Stock on hand{_scope(index, query)}** (totals — {summary}):\n" + _fmt_rows(
+        rows, lambda r: f"{r.drug} at {r.center_name}: {r.stock:g} units")
+
+
+def answer_redistribution(index: InventoryIndex, query: str) -> str:
+    moves = index.moves
+    if not moves.empty:
+        drugs, centers = index.match_drugs(query), index.match_centers(query)
+        if drugs:
+            moves = moves[moves['drug'].isin(drugs)]
+        if centers:
+            moves = moves[moves['from_center'].isin(centers) | moves['to_center'].isin(centers)]
+    if moves.empty:
+        return f"No redistribution needed{_scope(index, query)}."
+    return f"**Suggested moves{_scope(index, query)}:**\n" + _fmt_rows(
+        moves, lambda r: f"{r.qty:g} × {r.drug}: {r.from_center} → {r.to_center} ({r.reason})")
+
+
+LOCAL_HANDLERS = {
+    "expiry": answer_expiry,
+    "reorder": answer_reorder,
+    "forecast": answer_forecast,
+    "stock": answer_stock,
+    "redistribution": answer_redistribution,
+}
+
+
+def build_llm_context(index: InventoryIndex, query: str, max_tokens: int = 300) -> str:
+    """Compact context from precomputed aggregates, trimmed to roughly max_tokens.
+    Lines about drugs/centers mentioned in the query come first.
+    """
+    t = index.table
+    focus = index.select(query)
+    if len(focus) == len(t):
+        focus = t.iloc[0:0]
+    lines = [
+        f"Today: {index.today:%Y-%m-%d}. Centers: " + ", ".join(f"{k}={v}" for k, v in index.center_names.items()),
+    ]
+    lines += [f"{r.drug}@{r.center_id}: stock {r.stock:g}, rop {r.reorder_point:g}, "
+              f"fc{index.horizon}d {r.forecast_sum:g}, exp {r.expiry_date:%Y-%m-%d}" for r in focus.itertuples()]
+    by_drug = t.groupby('drug').agg(stock=('stock', 'sum'), forecast=('forecast_sum', 'sum'))
+    lines += [f"{d}: total stock {r.stock:g}, {index.horizon}d forecast {r.forecast:g}" for d, r in by_drug.iterrows()]
+    alerts = t[t['suggest_order_qty'] > 0].sort_values('suggest_order_qty', ascending=False)
+    if not alerts.empty:
+        lines.append("Reorder: " + ", ".join(f"{r.drug}@{r.center_id}+{r.suggest_order_qty}" for r in alerts.itertuples()))
+    soon = t[t['days_to_expiry'] <= 30].sort_values('days_to_expiry')
+    if not soon.empty:
+        lines.append("Expiring <=30d: " + ", ".join(f"{r.drug}@{r.center_id} {r.days_to_expiry}d" for r in soon.itertuples()))
+    if not index.moves.empty:
+        lines.append(f"Suggested redistribution moves: {len(index.moves)}")
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    out, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > budget:
+            break
+        out.append(line)
+        used += len(line) + 1
+    return "\n".join(out)
+
+
+class ChatRouter:
+    """Answers common inventory questions locally; everything else goes to the LLM.
+    llm: callable(query, context) -> str, e.g. groq_agent.chat_with_groq
+    """
+
+    def __init__(self, index: InventoryIndex, llm: Callable[[str, str], str], context_tokens: int = 300):
+        self.index = index
+        self.llm = llm
+        self.context_tokens = context_tokens
+        self.stats = {"local": 0, "llm": 0, "latency_ms": {"local": [], "llm": []}}
+
+    def answer(self, query: str) -> Dict:
+        """Returns {"answer", "source": "local"|"llm", "intent", "latency_ms"}."""
+        start = time.perf_counter()
+        intent = detect_intent(query)
+        if intent in ENTITY_INTENTS and not self.index.has_entity(query):
+            intent = None
+        text = None
+        if intent is not None:
+            missing = self.index.missing_terms(query)
+            if missing and not self.index.match_drugs(query):
+                text = f"No inventory records for {', '.join(m.title() for m in missing)}."
+            else:
+                # Handlers return None when they can't answer the question as asked
+                text = LOCAL_HANDLERS[intent](self.index, query)
+                if text is not None and missing:
+                    text = f"_No inventory records for {', '.join(m.title() for m in missing)}._\n\n" + text
+        if text is not None:
+            source = "local"
+        else:
+            intent = None
+            context = build_llm_context(self.index, query, max_tokens=self.context_tokens)
+            text, source = self.llm(query, context), "llm"
+        latency = (time.perf_counter() - start) * 1000
+        self.stats[source] += 1
+        self.stats["latency_ms"][source].append(latency)
+        return {"answer": text, "source": source, "intent": intent, "latency_ms": round(latency, 2)}
+
+    def summary(self) -> Dict:
+        """Local/LLM split and median latency (ms) per source."""
+        total = self.stats["local"] + self.stats["llm"]
+        out = {"total": total, "local": self.stats["local"], "llm": self.stats["llm"],
+               "local_share": round(self.stats["local"] / total, 3) if total else 0.0}
+        for source, values in self.stats["latency_ms"].items():
+            out[f"{source}_p50_ms"] = round(float(np.median(values)), 2) if values else None
+        return out
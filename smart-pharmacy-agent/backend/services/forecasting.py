@@ -28,3 +28,198 @@ def compute_forecast(df_hist: pd.DataFrame, center_id:str, drug:str, horizon:int
         return np.zeros(horizon)
     s = sub.set_index(pd.to_datetime(sub['date']))['qty'].asfreq('D').fillna(0)
     return ema_forecast(s, span=7, horizon=horizon)
+
+# ---- Vectorized local forecasters ----
+# Each takes Y: (n_series, n_days) daily demand matrix (oldest first, right-aligned
+# so every row ends at its last observed day, NaN before its first observed day)
+# and returns an (n_series, horizon) array. They loop over time only, so cost scales
+# with history length, not with the number of series.
+
+def history_matrix(df_hist: pd.DataFrame):
+    """Pivot long history (date, center_id, drug, qty) into a dense daily matrix on a
+    shared calendar. Days without a row are 0 in Y; first/last give each series' own
+    first and last observed column, so callers can tell missing days outside that span
+    from real zero demand. Returns (keys, Y, first, last, start_date) with
+    keys[i] = (center_id, drug) and column j = start_date + j days.
+    """
+    dates = pd.to_datetime(df_hist['date']).values.astype('datetime64[D]')
+    start, end = dates.min(), dates.max()
+    n_days = int((end - start).astype(int)) + 1
+    codes, uniques = pd.MultiIndex.from_arrays([df_hist['center_id'], df_hist['drug']]).factorize()
+    cols = (dates - start).astype(int)
+    flat = np.bincount(codes * n_days + cols, weights=df_hist['qty'].to_numpy(dtype=float),
+                       minlength=len(uniques) * n_days)
+    first = np.full(len(uniques), n_days, dtype=int)
+    last = np.full(len(uniques), -1, dtype=int)
+    np.minimum.at(first, codes, cols)
+    np.maximum.at(last, codes, cols)
+    return list(uniques), flat.reshape(len(uniques), n_days), first, last, pd.Timestamp(start)
+
+def align_history(Y: np.ndarray, first: np.ndarray, last: np.ndarray):
+    """Right-align each row's observed span (first..last) and pad the front with NaN."""
+    length = last - first + 1
+    width = int(length.max())
+    src = last[:, None] - (width - 1 - np.arange(width))[None, :]
+    valid = src >= first[:, None]
+    rows = np.arange(Y.shape[0])[:, None]
+    return np.where(valid, Y[rows, np.clip(src, 0, None)], np.nan)
+
+def _first_valid(Y: np.ndarray):
+    valid = ~np.isnan(Y)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), Y.shape[1])
+
+def moving_median_forecast(Y: np.ndarray, horizon:int=7, window:int=7):
+    tail = Y[:, -window:]
+    level = np.zeros(Y.shape[0])
+    gaps = np.isnan(tail)
+    if not gaps.any():
+        return np.repeat(np.median(tail, axis=1)[:, None], horizon, axis=1)
+    has = ~gaps.all(axis=1)
+    level[has] = np.nanmedian(tail[has], axis=1)
+    return np.repeat(level[:, None], horizon, axis=1)
+
+def _intermittent_init(Y: np.ndarray):
+    gaps = np.isnan(Y)
+    Z = np.where(gaps, 0.0, Y)
+    n_valid = Y.shape[1] - gaps.sum(axis=1)
+    n_nonzero = (Z > 0).sum(axis=1)
+    size = np.where(n_nonzero > 0, Z.sum(axis=1) / np.maximum(n_nonzero, 1), 0.0)
+    prob = n_nonzero / np.maximum(n_valid, 1)
+    return size, prob
+
+def croston_forecast(Y: np.ndarray, horizon:int=7, alpha:float=0.1):
+    """Croston with the SBA bias correction: demand size / inter-demand interval."""
+    size, prob = _intermittent_init(Y)
+    interval = np.where(prob > 0, 1.0 / np.maximum(prob, 1e-9), 1.0)
+    since = np.ones(Y.shape[0])
+    days = np.ascontiguousarray(Y.T)  # one contiguous row per day
+    observed = ~np.isnan(days)
+    for t in range(len(days)):
+        y = days[t]
+        hit = y > 0  # False for unobserved (NaN) days
+        size = np.where(hit, size + alpha * (y - size), size)
+        interval = np.where(hit, interval + alpha * (since - interval), interval)
+        since = np.where(hit, 1.0, since + observed[t])
+    rate = (1 - alpha / 2) * size / np.maximum(interval, 1.0)
+    return np.repeat(rate[:, None], horizon, axis=1)
+
+def tsb_forecast(Y: np.ndarray, horizon:int=7, alpha:float=0.1, beta:float=0.1):
+    """Teunter-Syntetos-Babai: demand probability is updated every day, so the
+    forecast decays towards 0 for items that have stopped selling."""
+    size, prob = _intermittent_init(Y)
+    days = np.ascontiguousarray(Y.T)  # one contiguous row per day
+    observed = ~np.isnan(days)
+    for t in range(len(days)):
+        y = days[t]
+        hit = y > 0  # False for unobserved (NaN) days
+        prob = prob + beta * observed[t] * (hit - prob)
+        size = np.where(hit, size + alpha * (y - size), size)
+    return np.repeat((prob * size)[:, None], horizon, axis=1)
+
+def holt_winters_forecast(Y: np.ndarray, horizon:int=7, alpha:float=0.2, beta:float=0.05,
+                          gamma:float=0.1, phi:float=0.9, season:int=7):
+    """Additive Holt-Winters with damped trend and weekly seasonality.
+    Initialized from each series' own first two seasons; shorter series fall back to a flat mean.
+    """
+    n, T = Y.shape
+    start = _first_valid(Y)
+    length = T - start
+    mean = np.where(np.isnan(Y), 0.0, Y).sum(axis=1) / np.maximum(length, 1)
+    out = np.repeat(mean[:, None], horizon, axis=1)
+    ok = length >= 2 * season
+    if not ok.any():
+        return out
+
+    Yk, sk = Y[ok], start[ok]
+    rows = np.arange(len(Yk))
+    init = np.take_along_axis(Yk, sk[:, None] + np.arange(2 * season)[None, :], axis=1)
+    level = init[:, :season].mean(axis=1)
+    trend = (init[:, season:].mean(axis=1) - level) / season
+    seas = init[:, :season] - level[:, None]
+    days = np.ascontiguousarray(Yk.T)  # one contiguous row per day
+    if (sk == sk[0]).all():
+        # common case: all rows start together, so every row uses the same season slot
+        for t in range(int(sk[0]) + season, T):
+            s = (t - sk[0]) % season
+            y = days[t]
+            prev_level = level
+            level = alpha * (y - seas[:, s]) + (1 - alpha) * (prev_level + phi * trend)
+            trend = beta * (level - prev_level) + (1 - beta) * phi * trend
+            seas[:, s] = gamma * (y - level) + (1 - gamma) * seas[:, s]
+    else:
+        for t in range(int(sk.min()) + season, T):
+            rel = t - sk
+            active = rel >= season
+            s = rel % season
+            y = days[t]
+            cur = seas[rows, s]
+            prev_level = level
+            new_level = alpha * (y - cur) + (1 - alpha) * (prev_level + phi * trend)
+            new_trend = beta * (new_level - prev_level) + (1 - beta) * phi * trend
+            seas[rows, s] = np.where(active, gamma * (y - new_level) + (1 - gamma) * cur, cur)
+            level = np.where(active, new_level, prev_level)
+            trend = np.where(active, new_trend, trend)
+    damp = np.cumsum(phi ** np.arange(1, horizon + 1))
+    idx = (length[ok][:, None] + np.arange(horizon)[None, :]) % season
+    out[ok] = np.maximum(0.0, level[:, None] + damp[None, :] * trend[:, None] + np.take_along_axis(seas, idx, axis=1))
+    return out
+
+# Checked in order; ties (e.g. all-zero series) go to the first model.
+FORECASTERS = {
+    'moving_median': moving_median_forecast,
+    'croston': croston_forecast,
+    'tsb': tsb_forecast,
+    'holt_winters': holt_winters_forecast,
+}
+
+def backtest_select(Y: np.ndarray, horizon:int=7, n_origins:int=3, min_train:int=14, models: dict = None):
+    """Rolling-origin backtest: fit on Y[:, :o], score RMSE on the next `horizon` days,
+    for the last n_origins origins. An origin counts for a series only if it has at least
+    min_train observed days before it. Returns (model index per series, or -1 when no origin
+    could be scored; model names; RMSE matrix, NaN for unscored series).
+    RMSE rather than MAE: on intermittent demand MAE is minimized by forecasting 0.
+    """
+    models = models or FORECASTERS
+    names = list(models)
+    n, T = Y.shape
+    start = _first_valid(Y)
+    origins = [T - k * horizon for k in range(n_origins, 0, -1) if T - k * horizon >= min_train]
+    errors = np.zeros((n, len(names)))
+    scored = np.zeros(n)
+    for o in origins:
+        eligible = (o - start) >= min_train
+        if not eligible.any():
+            continue
+        rows = slice(None) if eligible.all() else eligible
+        actual = Y[rows, o:o + horizon]
+        for j, name in enumerate(names):
+            fc = models[name](Y[rows, :o], horizon=horizon)
+            errors[eligible, j] += ((fc - actual) ** 2).mean(axis=1)
+        scored[eligible] += 1
+    errors = np.sqrt(errors / np.maximum(scored, 1)[:, None])
+    errors[scored == 0] = np.nan
+    best = np.where(scored > 0, np.nan_to_num(errors, nan=np.inf).argmin(axis=1), -1)
+    return best, names, errors
+
+def auto_forecast(df_hist: pd.DataFrame, horizon:int=7, n_origins:int=3):
+    """Forecast every (center_id, drug) series in df_hist with the model that had the
+    lowest backtest error for that series. Series too short to backtest use ema_forecast
+    and are reported as 'fallback'. Each forecast covers the `horizon` days after that
+    series' last observed day.
+    Returns ({(center_id, drug): forecast_array}, {(center_id, drug): model_name}).
+    """
+    if df_hist.empty:
+        return {}, {}
+    keys, Y, first, last, start_date = history_matrix(df_hist)
+    A = align_history(Y, first, last)
+    best, names, _ = backtest_select(A, horizon=horizon, n_origins=n_origins)
+    out = np.zeros((len(keys), horizon))
+    for j, name in enumerate(names):
+        mask = best == j
+        if mask.any():
+            out[mask] = FORECASTERS[name](A[mask], horizon=horizon)
+    for i in np.flatnonzero(best < 0):
+        index = pd.date_range(start_date + pd.Timedelta(days=int(first[i])), periods=int(last[i] - first[i] + 1), freq='D')
+        out[i] = ema_forecast(pd.Series(Y[i, first[i]:last[i] + 1], index=index), span=7, horizon=horizon)
+    return ({k: out[i] for i, k in enumerate(keys)},
+            {k: names[best[i]] if best[i] >= 0 else 'fallback' for i, k in enumerate(keys)})
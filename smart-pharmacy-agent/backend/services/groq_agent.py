@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import List
 from dotenv import load_dotenv
 
@@ -16,7 +17,9 @@ except Exception:
 #         raise RuntimeError("GROQ_API_KEY is not set. Export it or create a .env file.")
 #     return Groq(api_key=api_key)
 
+@lru_cache(maxsize=1)
 def _client():
+    # groq is imported on first use and the client is reused across calls
     from groq import Groq
     # Just instantiate without passing api_key — the SDK will pick it up
     # from the GROQ_API_KEY environment variable
@@ -1,45 +1,91 @@
+import hashlib
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, Optional, Tuple
 
-def near_expiry_redistribution(inventory_df: pd.DataFrame, demand_forecasts: dict, horizon:int=7, expiry_days:int=30):
-    """Suggest moving near-expiry stock to centers with predicted shortfall.
-    inventory_df: columns center_id, drug, stock, expiry_date
-    demand_forecasts: {(center_id, drug): forecast_array}
-    Returns DataFrame: from_center,to_center,drug,qty,reason
+MOVE_FIELDS = ['from_center', 'to_center', 'drug', 'qty', 'reason']
+
+def _today(today: Optional[date]) -> pd.Timestamp:
+    return pd.Timestamp(today or datetime.utcnow().date()).normalize()
+
+def iter_move_positions(inventory_df: pd.DataFrame, demand_forecasts: dict, horizon:int=7, expiry_days:int=30,
+                        today: Optional[date]=None, start: Tuple[int, int]=(0, 0)) -> Iterator[Tuple[Tuple[int, int], Dict]]:
+    """Yield (position, move) pairs, where position = (source row, target index) is where the move
+    sits in the stream. Passing a position back as `start` resumes exactly there: earlier source rows
+    are skipped without being evaluated, and only the current source's earlier targets are replayed
+    (to recover its remaining surplus).
     """
-    today = pd.Timestamp(datetime.utcnow().date())
-    inv = inventory_df.copy()
+    today = _today(today)
+    inv = inventory_df.reset_index(drop=True)
     inv['expiry_date'] = pd.to_datetime(inv['expiry_date'])
     inv['days_to_expiry'] = (inv['expiry_date'] - today).dt.days
-    near = inv[inv['days_to_expiry']<=expiry_days].copy()
+    near = inv[inv['days_to_expiry']<=expiry_days]
+    near = near[near.index >= start[0]]
+    if near.empty:
+        return
+
+    # stock per (center, drug) and candidate targets per drug, computed once
+    stock_by_key = inv.groupby(['center_id','drug'])['stock'].sum().to_dict()
+    targets: Dict[str, list] = {}
+    for (c2, d2), f2 in demand_forecasts.items():
+        targets.setdefault(d2, []).append((c2, sum(f2)))
 
-    moves = []
-    for _, row in near.iterrows():
-        key = (row.center_id, row.drug)
-        forecast = demand_forecasts.get(key, [0]*horizon)
+    for pos, row in zip(near.index, near.itertuples(index=False)):
+        forecast = demand_forecasts.get((row.center_id, row.drug), [0]*horizon)
         need = sum(forecast)  # demand over horizon
         surplus = max(0, row.stock - need)
         if surplus <= 0:
             continue
+        first_target = start[1] if pos == start[0] else 0
         # find target centers with deficit
-        for (c2, d2), f2 in demand_forecasts.items():
-            if d2 != row.drug or c2 == row.center_id: 
+        for j, (c2, need2) in enumerate(targets.get(row.drug, [])):
+            if c2 == row.center_id:
                 continue
-            need2 = sum(f2)
-            stock2 = inv[(inv.center_id==c2)&(inv.drug==row.drug)]['stock'].sum()
-            deficit = max(0, need2 - stock2)
+            deficit = max(0, need2 - stock_by_key.get((c2, row.drug), 0))
             if deficit<=0:
                 continue
             qty = min(surplus, deficit)
             if qty > 0:
-                moves.append({
-                    'from_center': row.center_id,
-                    'to_center': c2,
-                    'drug': row.drug,
-                    'qty': round(qty,2),
-                    'reason': f'Near expiry in {row.days_to_expiry} days'
-                })
+                if j >= first_target:
+                    yield (int(pos), j), {
+                        'from_center': row.center_id,
+                        'to_center': c2,
+                        'drug': row.drug,
+                        'qty': round(qty,2),
+                        'reason': f'Near expiry in {row.days_to_expiry} days'
+                    }
                 surplus -= qty
                 if surplus<=0:
                     break
-    return pd.DataFrame(moves)
+
+def iter_near_expiry_moves(inventory_df: pd.DataFrame, demand_forecasts: dict, horizon:int=7, expiry_days:int=30,
+                           today: Optional[date]=None, start: Tuple[int, int]=(0, 0)) -> Iterator[Dict]:
+    """Yield moves one at a time (same order and values as near_expiry_redistribution),
+    so callers can stream or paginate without materializing the full result.
+    today: reference date for days-to-expiry (defaults to the current UTC date).
+    start: resume position from iter_move_positions.
+    """
+    for _, move in iter_move_positions(inventory_df, demand_forecasts, horizon, expiry_days, today, start):
+        yield move
+
+def moves_version(inventory_df: pd.DataFrame, demand_forecasts: dict, horizon:int=7, expiry_days:int=30,
+                  today: Optional[date]=None) -> str:
+    """Digest of everything the move stream depends on. Positions are only meaningful for the
+    same inputs, so pagination cursors carry this and are rejected once it changes.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    inv = inventory_df[['center_id', 'drug', 'stock']].assign(expiry_date=pd.to_datetime(inventory_df['expiry_date']))
+    h.update(pd.util.hash_pandas_object(inv, index=False).values.tobytes())
+    h.update(repr((str(_today(today).date()), horizon, expiry_days)).encode())
+    # insertion order matters: it is the target order
+    h.update(repr([(key, float(sum(fc))) for key, fc in demand_forecasts.items()]).encode())
+    return h.hexdigest()
+
+def near_expiry_redistribution(inventory_df: pd.DataFrame, demand_forecasts: dict, horizon:int=7, expiry_days:int=30,
+                               today: Optional[date]=None):
+    """Suggest moving near-expiry stock to centers with predicted shortfall.
+    inventory_df: columns center_id, drug, stock, expiry_date
+    demand_forecasts: {(center_id, drug): forecast_array}
+    Returns DataFrame: from_center,to_center,drug,qty,reason
+    """
+    return pd.DataFrame(list(iter_near_expiry_moves(inventory_df, demand_forecasts, horizon, expiry_days, today)))
@@ -1,10 +1,13 @@
-from haversine import haversine
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 def nearest_neighbor_route(depot, stops):
     """depot: (lat,lon); stops: list of (id, lat, lon)
     Returns order of stop ids and total distance (km).
     """
+    from haversine import haversine
     remaining = stops[:]
     route = []
     dist = 0.0
@@ -23,7 +26,7 @@ def nearest_neighbor_route(depot, stops):
     dist += haversine(curr, depot)
     return route, dist
 
-def build_stops_from_moves(moves_df: pd.DataFrame, centers_df: pd.DataFrame, depot_center_id:str):
+def build_stops_from_moves(moves_df: "pd.DataFrame", centers_df: "pd.DataFrame", depot_center_id:str):
     ids = set(moves_df['to_center'].tolist())
     ids.add(depot_center_id)
     locs = centers_df[centers_df.center_id.isin(ids)].set_index('center_id')[['lat','lon']].to_dict('index')
@@ -0,0 +1,119 @@
+import base64
+import csv
+import io
+import json
+import math
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    # Optional: orjson encodes numpy arrays/scalars and datetimes natively and is much faster
+    import orjson
+except ImportError:  # pragma: no cover - fallback when orjson is not installed
+    orjson = None
+
+
+def _default(obj):
+    """Encode NumPy/pandas values the JSON encoders don't handle natively."""
+    if isinstance(obj, np.generic):
+        value = obj.item()
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return value
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    # pd.NaT / pd.NA / pd.Timedelta etc. without importing pandas here
+    if type(obj).__name__ in ("NaTType", "NAType"):
+        return None
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj):
+    """Replace NaN/inf floats with None, as orjson does. Needed for the stdlib path because
+    np.float64 subclasses float, so json encodes it without calling _default."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_finite(obj), default=_default, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def iter_ndjson(rows: Iterable[Dict], batch_size: int = 1000) -> Iterator[bytes]:
+    """One JSON object per line, yielded in chunks of up to batch_size rows."""
+    buf: List[bytes] = []
+    for row in rows:
+        buf.append(dumps(row))
+        if len(buf) >= batch_size:
+            yield b"\n".join(buf) + b"\n"
+            buf = []
+    if buf:
+        yield b"\n".join(buf) + b"\n"
+
+
+def iter_csv(rows: Iterable[Dict], fields: List[str], batch_size: int = 1000) -> Iterator[bytes]:
+    """CSV with header row, yielded in chunks of up to batch_size rows."""
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    n = 0
+    for row in rows:
+        writer.writerow(row)
+        n += 1
+        if n % batch_size == 0:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate(0)
+    tail = out.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+# ---- Cursor pagination ----
+# Cursors are opaque to clients: {"p": position, "v": version} as base64 JSON. The position
+# is where the producer resumes (see redistribution.iter_move_positions), so a page costs the
+# producer's setup plus the page itself rather than every row before it. The version lets
+# the caller reject cursors issued for different data.
+
+def encode_cursor(position, version: Optional[str] = None) -> str:
+    return base64.urlsafe_b64encode(dumps({"p": position, "v": version})).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict]:
+    """{"p": [ints...], "v": version} or None when no cursor was given."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded))
+        position = state["p"]
+    except Exception:
+        raise ValueError("invalid cursor")
+    if not isinstance(position, list) or not all(isinstance(p, int) and p >= 0 for p in position):
+        raise ValueError("invalid cursor")
+    return state
+
+
+def page(rows: Iterable[Tuple[object, Dict]], limit: int = 1000, version: Optional[str] = None) -> Dict:
+    """Materialize one page from (position, item) pairs: {"items": [...], "next_cursor": str | None}.
+    next_cursor points at the first item not returned.
+    """
+    items: List[Dict] = []
+    for position, item in rows:
+        if len(items) == limit:
+            return {"items": items, "next_cursor": encode_cursor(position, version)}
+        items.append(item)
+    return {"items": items, "next_cursor": None}
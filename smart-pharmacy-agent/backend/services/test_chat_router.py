@@ -0,0 +1,169 @@
+"""
+Chat Router Test: local intent answers vs LLM fallback 💬
+
+Checks that common inventory questions are answered locally from the precomputed
+index and only open-ended questions reach the LLM (with a budgeted context).
+
+Run directly (also prints the local/LLM split and latency):
+    python backend/services/test_chat_router.py
+"""
+
+import os
+import sys
+from datetime import date
+
+import pandas as pd
+
+# Add root dir so "backend" can be imported
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.services.forecasting import auto_forecast
+from backend.services.chat_router import InventoryIndex, ChatRouter, detect_intent, build_llm_context, expiry_window
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../..", "data"))
+TODAY = date(2025, 9, 20)
+
+
+def _router(calls: list, today: date = TODAY) -> ChatRouter:
+    inv = pd.read_csv(os.path.join(DATA_DIR, "sample_inventory.csv"), parse_dates=["expiry_date"])
+    hist = pd.read_csv(os.path.join(DATA_DIR, "demand_signals.csv"))
+    centers = pd.read_csv(os.path.join(DATA_DIR, "centers.csv"))
+
+    def fake_llm(query: str, context: str) -> str:
+        calls.append((query, context))
+        return "LLM answer"
+
+    return ChatRouter(InventoryIndex(inv, hist, centers, today=today), fake_llm, context_tokens=120)
+
+
+def test_intents():
+    assert detect_intent("Which medicines expire next month?") == "expiry"
+    assert detect_intent("Show me reorder alerts for antibiotics") == "reorder"
+    assert detect_intent("What is the demand forecast for Insulin?") == "forecast"
+    assert detect_intent("How much Insulin is in stock at C02?") == "stock"
+    assert detect_intent("How many units left of Amoxicillin?") == "stock"
+    assert detect_intent("Why do pharmacies use FEFO?") is None
+    # open-ended questions that mention a topic word still go to the LLM
+    for q in [
+        "How can I improve inventory management?",
+        "What are the expected effects of price levels on purchasing?",
+        "Explain reorder point formula",
+        "Why is there a shortage of insulin and what should we do about it?",
+        "What is the best way to move stock between clinics?",
+        "remove expired aspirin",
+        # demand, sales and run-out questions are not stock lookups
+        "How much insulin will we need next week?",
+        "How many days until insulin runs out?",
+        "How much insulin did C01 sell last week?",
+    ]:
+        assert detect_intent(q) is None, q
+
+
+def test_local_answers():
+    calls = []
+    router = _router(calls)
+
+    res = router.answer("Which medicines expire next month?")
+    assert res["source"] == "local"
+    # next month = October 2025: Insulin@C03 (10-05), Amoxicillin@C03 (10-12), C02 (10-25), Insulin@C01 (10-30)
+    assert res["answer"].count("\n- ") == 4
+    assert "Nov" not in res["answer"] and "Dec" not in res["answer"]
+
+    res = router.answer("reorder alerts for antibiotics")
+    assert res["source"] == "local"
+    assert "Amoxicillin" in res["answer"] and "Insulin" not in res["answer"]
+
+    # named drugs the index doesn't hold never widen to other drugs
+    res = router.answer("How much paracetamol is in stock at C02?")
+    assert res["source"] == "local" and res["answer"] == "No inventory records for Paracetamol."
+    res = router.answer("Which aspirin lots expire next month?")
+    assert "Insulin" not in res["answer"] and "Amoxicillin" not in res["answer"]
+
+    assert calls == []
+
+    # stock questions without a drug or center are not inventory lookups
+    res = router.answer("How many centers do we have?")
+    assert res["source"] == "llm"
+
+
+def test_expiry_windows():
+    today = pd.Timestamp(TODAY)
+    assert expiry_window("Which medicines expire?", today) == (today, pd.Timestamp("2025-10-20"))
+    assert expiry_window("Which medicines expire in December?", today) == (pd.Timestamp("2025-12-01"), pd.Timestamp("2025-12-31"))
+    assert expiry_window("Which lots expired in March?", today) == (pd.Timestamp("2025-03-01"), pd.Timestamp("2025-03-31"))
+    assert expiry_window("How many insulin lots expired last month?", today) == (pd.Timestamp("2025-08-01"), pd.Timestamp("2025-08-31"))
+    assert expiry_window("Which lots have expired?", today) == (None, pd.Timestamp("2025-09-19"))
+    # a time expression we can't parse is not silently replaced by the default
+    for q in ["Which lots expired two weeks ago?", "Which medicines expire before Christmas?",
+              "What expires between October and December?"]:
+        assert expiry_window(q, today) is None, q
+
+
+def test_expiry_month_names_and_past_ranges():
+    calls = []
+    router = _router(calls)
+    res = router.answer("Which medicines expire in December?")
+    assert res["source"] == "local"
+    assert res["answer"].count("\n- ") == 1 and "Amoxicillin at City Hospital" in res["answer"]
+
+    router = _router(calls, today=date(2025, 11, 20))
+    res = router.answer("How many insulin lots expired last month?")
+    # October 2025: Insulin@C03 (10-05) and Insulin@C01 (10-30)
+    assert res["source"] == "local" and res["answer"].startswith("**Expired 01 Oct 2025")
+    assert res["answer"].count("\n- ") == 2 and "Amoxicillin" not in res["answer"]
+    assert calls == []
+
+    res = router.answer("Which lots expired two weeks ago?")
+    assert res["source"] == "llm" and res["intent"] is None and len(calls) == 1
+
+
+def test_redistribution_uses_index_date():
+    inv = pd.read_csv(os.path.join(DATA_DIR, "sample_inventory.csv"), parse_dates=["expiry_date"])
+    hist = pd.read_csv(os.path.join(DATA_DIR, "demand_signals.csv"))
+    centers = pd.read_csv(os.path.join(DATA_DIR, "centers.csv"))
+    router = ChatRouter(InventoryIndex(inv, hist, centers, today=date(2025, 10, 20)), lambda q, c: "")
+    res = router.answer("Any redistribution suggestions?")
+    # Insulin@C01 expires 2025-10-30
+    assert res["source"] == "local" and "Near expiry in 10 days" in res["answer"]
+
+
+def test_index_uses_shared_forecasts():
+    inv = pd.read_csv(os.path.join(DATA_DIR, "sample_inventory.csv"), parse_dates=["expiry_date"])
+    hist = pd.read_csv(os.path.join(DATA_DIR, "demand_signals.csv"))
+    centers = pd.read_csv(os.path.join(DATA_DIR, "centers.csv"))
+    forecasts, _ = auto_forecast(hist, horizon=7)
+    index = InventoryIndex(inv, hist, centers, today=TODAY)
+    expected = [round(float(forecasts[(c, d)].sum()), 2) for c, d in zip(inv.center_id, inv.drug)]
+    assert index.table['forecast_sum'].tolist() == expected
+
+    shared = {key: fc * 0 + 1 for key, fc in forecasts.items()}
+    index = InventoryIndex(inv, hist, centers, today=TODAY, forecasts=shared)
+    assert (index.table['forecast_sum'] == 7).all()
+
+
+def test_llm_fallback_context_is_budgeted():
+    calls = []
+    router = _router(calls)
+    res = router.answer("Why do pharmacies use FEFO?")
+    assert res["source"] == "llm" and res["answer"] == "LLM answer"
+    assert len(calls[0][1]) <= 120 * 4
+    assert router.summary()["llm"] == 1
+
+    context = build_llm_context(router.index, "Tell me about Insulin at C01", max_tokens=1000)
+    assert "Insulin@C01" in context.splitlines()[1]
+
+
+if __name__ == "__main__":
+    calls = []
+    router = _router(calls)
+    for q in [
+        "Which medicines expire next month?",
+        "Show me reorder alerts for antibiotics",
+        "What is the demand forecast for Insulin?",
+        "How much stock is at Metro Clinic?",
+        "Any redistribution suggestions?",
+        "Why do pharmacies use FEFO?",
+    ]:
+        res = router.answer(q)
+        print(f"\n❓ {q}\n[{res['source']} · {res['latency_ms']} ms]\n{res['answer']}")
+    print(f"\n📊 {router.summary()}")
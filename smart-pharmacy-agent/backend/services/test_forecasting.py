@@ -0,0 +1,142 @@
+"""
+Forecasting Test & Benchmark: vectorized local forecasters 📈
+
+Checks Croston/TSB, Holt-Winters, moving median and the per-series backtest
+selection, and times auto model selection across many synthetic series.
+
+Scale via env: BENCH_SERIES (default 100000), BENCH_DAYS (default 120).
+
+Run directly:
+    python backend/services/test_forecasting.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add root dir so "backend" can be imported
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.services.forecasting import (
+    FORECASTERS, align_history, auto_forecast, backtest_select, croston_forecast, history_matrix,
+    holt_winters_forecast, moving_median_forecast, tsb_forecast,
+)
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../..", "data"))
+SELECTION_BUDGET_S = float(os.getenv("FORECAST_SELECTION_BUDGET", "5.0"))
+
+
+def synthetic_demand(n_series: int, n_days: int, seed: int = 0) -> np.ndarray:
+    """Mix of intermittent (specialty) and steady weekly-seasonal series."""
+    rng = np.random.default_rng(seed)
+    weekly = 1 + 0.5 * np.sin(2 * np.pi * np.arange(n_days) / 7)
+    steady = rng.poisson(10 * weekly, (n_series, n_days)).astype(float)
+    sparse = (rng.random((n_series, n_days)) < 0.1) * rng.poisson(4, (n_series, n_days))
+    is_sparse = rng.random(n_series) < 0.5
+    return np.where(is_sparse[:, None], sparse, steady)
+
+
+def test_history_matrix_fills_missing_days():
+    df = pd.DataFrame({
+        'date': ['2025-01-01', '2025-01-03', '2025-01-03', '2025-01-02'],
+        'center_id': ['C01', 'C01', 'C01', 'C02'],
+        'drug': ['X', 'X', 'X', 'X'],
+        'qty': [1, 2, 3, 4],
+    })
+    keys, Y, first, last, start = history_matrix(df)
+    assert keys == [('C01', 'X'), ('C02', 'X')]
+    assert Y.tolist() == [[1, 0, 5], [0, 4, 0]]
+    assert first.tolist() == [0, 1] and last.tolist() == [2, 1]
+    assert start == pd.Timestamp('2025-01-01')
+    A = align_history(Y, first, last)
+    assert A[0].tolist() == [1, 0, 5]
+    assert np.isnan(A[1, :2]).all() and A[1, 2] == 4
+
+
+def test_late_start_series_is_not_diluted():
+    # A: 8 weeks of weekly-seasonal history. B: starts 4 weeks before the end at a steady
+    # 10/day, and its final day has no row; neither gap should count as zero demand.
+    days = pd.date_range('2025-01-01', periods=56, freq='D')
+    pattern = [5, 10, 15, 10, 5, 1, 1] * 8
+    rows = [{'date': d, 'center_id': 'C01', 'drug': 'A', 'qty': q} for d, q in zip(days, pattern)]
+    rows += [{'date': d, 'center_id': 'C01', 'drug': 'B', 'qty': 10} for d in days[27:55]]
+    forecasts, models = auto_forecast(pd.DataFrame(rows), horizon=7)
+    assert np.allclose(forecasts[('C01', 'B')], 10, atol=0.5), (models, forecasts[('C01', 'B')])
+    assert models[('C01', 'B')] != 'fallback'
+    assert np.allclose(forecasts[('C01', 'A')], pattern[:7], atol=1.5)
+
+
+def test_short_series_fall_back_explicitly():
+    days = pd.date_range('2025-01-01', periods=4, freq='D')
+    hist = pd.DataFrame({'date': days, 'center_id': 'C01', 'drug': 'X', 'qty': [20, 22, 24, 26]})
+    forecasts, models = auto_forecast(hist, horizon=7)
+    assert models[('C01', 'X')] == 'fallback'
+    assert forecasts[('C01', 'X')].sum() > 100
+
+    best, _, errors = backtest_select(np.ones((2, 10)), horizon=7)
+    assert best.tolist() == [-1, -1] and np.isnan(errors).all()
+
+
+def test_forecasters_shapes_and_behaviour():
+    Y = synthetic_demand(50, 60)
+    for name, fn in FORECASTERS.items():
+        fc = fn(Y, horizon=5)
+        assert fc.shape == (50, 5), name
+        assert (fc >= 0).all(), name
+
+    # intermittent: 4 units every 4th day -> rate ~1/day
+    sparse = np.tile([4.0, 0, 0, 0], 15)[None, :]
+    assert abs(croston_forecast(sparse)[0, 0] - 1.0) < 0.1
+    assert abs(tsb_forecast(sparse)[0, 0] - 1.0) < 0.2
+    # TSB decays once demand stops; Croston does not
+    stopped = np.concatenate([sparse, np.zeros((1, 40))], axis=1)
+    assert tsb_forecast(stopped)[0, 0] < 0.1 < croston_forecast(stopped)[0, 0]
+
+    # Holt-Winters recovers a clean weekly pattern
+    pattern = np.array([5, 10, 15, 10, 5, 1, 1], dtype=float)
+    seasonal = np.tile(pattern, 8)[None, :]
+    assert np.allclose(holt_winters_forecast(seasonal, horizon=7)[0], pattern, atol=1.0)
+    assert moving_median_forecast(seasonal, horizon=3).tolist() == [[5, 5, 5]]
+
+
+def test_backtest_picks_the_right_model():
+    pattern = np.array([5, 10, 15, 10, 5, 1, 1], dtype=float)
+    Y = np.vstack([np.tile(pattern, 8), np.tile([4.0, 0, 0, 0], 14)])
+    best, names, _ = backtest_select(Y, horizon=7)
+    assert names[best[0]] == 'holt_winters'
+    assert names[best[1]] in ('croston', 'tsb')
+
+
+def test_auto_forecast_on_sample_data():
+    hist = pd.read_csv(os.path.join(DATA_DIR, "demand_signals.csv"))
+    forecasts, models = auto_forecast(hist, horizon=7)
+    assert set(forecasts) == set(zip(hist.center_id, hist.drug))
+    assert all(len(fc) == 7 for fc in forecasts.values())
+    assert set(models.values()) <= set(FORECASTERS) | {'fallback'}
+
+
+def test_selection_is_fast():
+    Y = synthetic_demand(20_000, 120)
+    start = time.perf_counter()
+    backtest_select(Y, horizon=7)
+    elapsed = time.perf_counter() - start
+    assert elapsed < SELECTION_BUDGET_S, elapsed
+
+
+if __name__ == "__main__":
+    n_series = int(os.getenv("BENCH_SERIES", "100000"))
+    n_days = int(os.getenv("BENCH_DAYS", "120"))
+    Y = synthetic_demand(n_series, n_days)
+    print(f"\n========== BENCH: {n_series:,} series × {n_days} days ==========")
+    for name, fn in FORECASTERS.items():
+        start = time.perf_counter()
+        fn(Y, horizon=7)
+        print(f"⏱️ {name:14s} {time.perf_counter() - start:6.2f} s")
+    start = time.perf_counter()
+    best, names, errors = backtest_select(Y, horizon=7)
+    print(f"⏱️ backtest selection {time.perf_counter() - start:6.2f} s")
+    for j, name in enumerate(names):
+        print(f"  📊 {name:14s} chosen for {np.mean(best == j):6.1%} of series")
@@ -0,0 +1,129 @@
+"""
+Startup Benchmark: import time and time-to-first-response ⏱️
+
+Each measurement runs in a fresh interpreter so module caches don't hide cold-start cost:
+    1. API: import `backend.main`, then time the first `GET /health`
+    2. Dashboard: first full render of `frontend/streamlit_app.py` (Streamlit AppTest)
+    3. Heavy ML/LLM dependencies must not be imported by either startup path
+
+Budgets (seconds) can be tuned via env:
+    STARTUP_API_IMPORT_BUDGET, STARTUP_API_FIRST_RESPONSE_BUDGET, STARTUP_DASHBOARD_BUDGET
+
+Run directly:
+    python backend/services/test_startup.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+DASHBOARD_PATH = os.path.join(ROOT_DIR, "frontend", "streamlit_app.py")
+
+# Loaded lazily by the services; importing them at startup is a regression.
+HEAVY_MODULES = ["faster_whisper", "ctranslate2", "gtts", "groq"]
+
+API_IMPORT_BUDGET = float(os.getenv("STARTUP_API_IMPORT_BUDGET", "3.0"))
+API_FIRST_RESPONSE_BUDGET = float(os.getenv("STARTUP_API_FIRST_RESPONSE_BUDGET", "1.0"))
+DASHBOARD_BUDGET = float(os.getenv("STARTUP_DASHBOARD_BUDGET", "8.0"))
+
+API_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from backend.main import app
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    t2 = time.perf_counter()
+    resp = client.get("/health")
+    t3 = time.perf_counter()
+print(json.dumps({
+    "import_s": t1 - t0,
+    "first_response_s": t3 - t2,
+    "status": resp.status_code,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+DASHBOARD_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file(%r, default_timeout=600)
+at.run()
+t1 = time.perf_counter()
+print(json.dumps({
+    "first_render_s": t1 - t0,
+    "exceptions": len(at.exception),
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def _run_probe(code: str) -> Dict:
+    """Run `code` in a fresh interpreter (cwd = temp dir so the sqlite db stays out of the tree)."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env["WARMUP_ON_STARTUP"] = "0"
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = subprocess.run(
+            [sys.executable, "-c", code], cwd=tmp, env=env, capture_output=True, text=True
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _heavy_loaded(modules) -> list:
+    return [m for m in HEAVY_MODULES if m in modules]
+
+
+def measure_api_startup() -> Dict:
+    result = _run_probe(API_PROBE)
+    result["heavy_loaded"] = _heavy_loaded(result.pop("modules"))
+    return result
+
+
+def measure_dashboard_startup() -> Dict:
+    result = _run_probe(DASHBOARD_PROBE % DASHBOARD_PATH)
+    result["heavy_loaded"] = _heavy_loaded(result.pop("modules"))
+    return result
+
+
+def test_api_startup_within_budget():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    result = measure_api_startup()
+    assert result["status"] == 200
+    assert result["heavy_loaded"] == []
+    assert result["import_s"] < API_IMPORT_BUDGET, result
+    assert result["first_response_s"] < API_FIRST_RESPONSE_BUDGET, result
+
+
+def test_dashboard_startup_within_budget():
+    pytest.importorskip("streamlit")
+    result = measure_dashboard_startup()
+    assert result["exceptions"] == 0, result
+    assert result["heavy_loaded"] == [], result
+    assert result["first_render_s"] < DASHBOARD_BUDGET, result
+
+
+if __name__ == "__main__":
+    print("\n========== STARTUP: API ==========")
+    api = measure_api_startup()
+    print(f"⏱️ import backend.main: {api['import_s']*1000:.1f} ms")
+    print(f"⏱️ first GET /health: {api['first_response_s']*1000:.1f} ms (status {api['status']})")
+    print(f"📦 heavy modules loaded: {api['heavy_loaded'] or 'none'}")
+
+    print("\n========== STARTUP: DASHBOARD ==========")
+    try:
+        dash = measure_dashboard_startup()
+        print(f"⏱️ first render: {dash['first_render_s']:.2f} s ({dash['exceptions']} exceptions)")
+        print(f"📦 heavy modules loaded: {dash['heavy_loaded'] or 'none'}")
+    except Exception as e:
+        print(f"⚠️ Dashboard benchmark skipped: {e}")
@@ -0,0 +1,224 @@
+"""
+Streaming Serialization Test & Benchmark: /redistribute result encoding 📦
+
+Compares the legacy path (DataFrame → to_dict(orient='records') → json) against
+incremental NDJSON streaming for a large synthetic network:
+    - peak Python memory (tracemalloc)
+    - time-to-first-byte (first encoded chunk)
+
+Scale via env: BENCH_SOURCES, BENCH_TARGETS (moves = sources × targets).
+
+Run directly:
+    python backend/services/test_streaming.py
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add root dir so "backend" can be imported
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.services.redistribution import (
+    near_expiry_redistribution, iter_near_expiry_moves, iter_move_positions, moves_version, MOVE_FIELDS,
+)
+from backend.services.serialization import dumps, iter_ndjson, iter_csv, page, decode_cursor
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../..", "data"))
+
+
+def synthetic_network(sources: int, targets: int) -> Tuple[pd.DataFrame, Dict]:
+    """Every near-expiry source has surplus and every target a small deficit,
+    so each source yields one move per target (sources × targets moves).
+    """
+    today = date.today()
+    rows, demand = [], {}
+    for i in range(sources):
+        rows.append({'center_id': f'S{i:05d}', 'drug': 'Insulin', 'stock': 1e6, 'expiry_date': today + timedelta(days=10)})
+    for j in range(targets):
+        rows.append({'center_id': f'T{j:05d}', 'drug': 'Insulin', 'stock': 0.0, 'expiry_date': today + timedelta(days=365)})
+    for r in rows:
+        demand[(r['center_id'], r['drug'])] = np.ones(7)
+    return pd.DataFrame(rows), demand
+
+
+def _measure(run: Callable[[], object]) -> Dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_byte_s, total_bytes = None, 0
+    for chunk in run():
+        if first_byte_s is None:
+            first_byte_s = time.perf_counter() - start
+        total_bytes += len(chunk)
+    total_s = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ttfb_s": first_byte_s, "total_s": total_s, "peak_mb": peak / 2**20, "bytes": total_bytes}
+
+
+def benchmark(sources: int, targets: int) -> Dict[str, Dict]:
+    inv, demand = synthetic_network(sources, targets)
+
+    def legacy():
+        moves = near_expiry_redistribution(inv, demand, horizon=7, expiry_days=30)
+        yield json.dumps(moves.to_dict(orient='records')).encode("utf-8")
+
+    def streaming():
+        yield from iter_ndjson(iter_near_expiry_moves(inv, demand, horizon=7, expiry_days=30))
+
+    return {"legacy_json": _measure(legacy), "ndjson_stream": _measure(streaming)}
+
+
+def test_iter_matches_dataframe():
+    inv = pd.read_csv(os.path.join(DATA_DIR, "test_redistribution_routing.csv"))
+    inv['expiry_date'] = date.today() + timedelta(days=5)
+    demand = {(r.center_id, r.drug): [r.avg_daily_demand] * 7 for r in inv.itertuples()}
+    demand[("C02", "Insulin")] = [100] * 7
+    df = near_expiry_redistribution(inv, demand)
+    assert not df.empty
+    assert df.to_dict(orient='records') == list(iter_near_expiry_moves(inv, demand))
+
+
+def test_serializers_handle_numpy_and_pagination():
+    row = {'qty': np.float64(1.5), 'n': np.int64(3), 'arr': np.arange(2), 'when': pd.Timestamp('2025-01-02')}
+    assert json.loads(dumps(row)) == {'qty': 1.5, 'n': 3, 'arr': [0, 1], 'when': '2025-01-02T00:00:00'}
+
+    rows = [{'from_center': 'A', 'to_center': f'B{i}', 'drug': 'X', 'qty': i, 'reason': 'r'} for i in range(5)]
+    lines = b"".join(iter_ndjson(iter(rows), batch_size=2)).splitlines()
+    assert [json.loads(l) for l in lines] == rows
+    csv_text = b"".join(iter_csv(iter(rows), MOVE_FIELDS, batch_size=2)).decode()
+    assert csv_text.splitlines()[0] == ",".join(MOVE_FIELDS) and len(csv_text.splitlines()) == 6
+
+    positioned = [([i], r) for i, r in enumerate(rows)]
+    first = page(iter(positioned), 2, version="v1")
+    assert first["items"] == rows[:2]
+    assert decode_cursor(first["next_cursor"]) == {"p": [2], "v": "v1"}
+    last = page(iter(positioned[4:]), 2)
+    assert last == {"items": rows[4:], "next_cursor": None}
+
+
+def test_resume_from_any_position():
+    # Sources cover 2.5 targets each, so resuming mid-source must replay its earlier targets.
+    inv, demand = synthetic_network(3, 4)
+    inv.loc[inv.center_id.str.startswith('S'), 'stock'] = 25.0
+    full = list(iter_move_positions(inv, demand))
+    assert [m['qty'] for _, m in full[:3]] == [7, 7, 4]
+    for k, (position, _) in enumerate(full):
+        assert list(iter_near_expiry_moves(inv, demand, start=position)) == [m for _, m in full[k:]]
+
+    version = moves_version(inv, demand)
+    assert moves_version(inv, demand) == version
+    assert moves_version(inv, demand, today=date.today() + timedelta(days=1)) != version
+    inv.loc[0, 'stock'] = 30.0
+    assert moves_version(inv, demand) != version
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    from backend.services import serialization
+    row = {'qty': np.float64('nan'), 'vals': [float('inf'), 1.0], 'n': np.int64(2)}
+    fast = serialization.dumps(row)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(serialization.dumps(row)) == json.loads(fast) == {'qty': None, 'vals': [None, 1.0], 'n': 2}
+
+
+def _api_client(monkeypatch, tmp_path):
+    """TestClient over an in-memory database with one near-expiry source and 5 short targets."""
+    monkeypatch.chdir(tmp_path)  # backend.db creates ./inventory.db on import
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from backend import main
+    from backend.db import Base, get_db
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(main, "get_db", override_db)  # /redistribute calls get_db() directly
+    main.app.dependency_overrides[get_db] = override_db
+    client = TestClient(main.app)
+    soon, later = str(date.today() + timedelta(days=5)), str(date.today() + timedelta(days=365))
+    rows = [{'center_id': 'S1', 'drug': 'Insulin', 'stock': 1000, 'avg_daily_demand': 1, 'expiry_date': soon}]
+    rows += [{'center_id': f'T{i}', 'drug': 'Insulin', 'stock': 0, 'avg_daily_demand': 10, 'expiry_date': later}
+             for i in range(5)]
+    for r in rows:
+        assert client.post("/inventory", json=r).status_code == 200
+    return client, main
+
+
+def test_redistribute_endpoint_formats_and_pagination(monkeypatch, tmp_path):
+    client, main = _api_client(monkeypatch, tmp_path)
+    try:
+        full = client.post("/redistribute").json()
+        assert [m['to_center'] for m in full] == [f'T{i}' for i in range(5)]
+
+        resp = client.post("/redistribute", params={"format": "ndjson"})
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(l) for l in resp.text.splitlines()] == full
+
+        resp = client.post("/redistribute", params={"format": "csv", "limit": 2})
+        lines = resp.text.splitlines()
+        assert resp.headers["content-type"].startswith("text/csv")
+        assert lines[0] == ",".join(MOVE_FIELDS) and len(lines) == 3
+
+        items, cursor = [], None
+        while True:
+            body = client.post("/redistribute", params={"limit": 2, **({"cursor": cursor} if cursor else {})}).json()
+            items += body["items"]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert items == full
+
+        resp = client.post("/redistribute", params={"cursor": "not-a-cursor"})
+        assert resp.status_code == 400 and resp.json() == {"error": "invalid cursor"}
+
+        # cursors issued before the inventory changed are rejected, not silently shifted
+        cursor = client.post("/redistribute", params={"limit": 2}).json()["next_cursor"]
+        later = str(date.today() + timedelta(days=365))
+        client.post("/inventory", json={'center_id': 'T9', 'drug': 'Insulin', 'stock': 0,
+                                        'avg_daily_demand': 10, 'expiry_date': later})
+        resp = client.post("/redistribute", params={"limit": 2, "cursor": cursor})
+        assert resp.status_code == 400 and resp.json() == {"error": "stale cursor"}
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+def test_streaming_beats_legacy_on_large_results():
+    result = benchmark(sources=150, targets=200)  # 30k moves
+    legacy, stream = result["legacy_json"], result["ndjson_stream"]
+    assert stream["peak_mb"] < legacy["peak_mb"], result
+    assert stream["ttfb_s"] < legacy["ttfb_s"], result
+
+
+if __name__ == "__main__":
+    sources = int(os.getenv("BENCH_SOURCES", "500"))
+    targets = int(os.getenv("BENCH_TARGETS", "400"))
+    print(f"\n========== BENCH: {sources * targets:,} moves ==========")
+    for name, m in benchmark(sources, targets).items():
+        print(f"📦 {name:14s} ttfb {m['ttfb_s']*1000:8.1f} ms | total {m['total_s']:6.2f} s | "
+              f"peak {m['peak_mb']:7.1f} MB | {m['bytes']/2**20:6.1f} MB out")
+
+    # last page of 100: resume from its position vs skipping every earlier move
+    inv, demand = synthetic_network(sources, targets)
+    start = time.perf_counter()
+    page(iter_move_positions(inv, demand, start=(sources - 1, targets - 100)), 100)
+    resumed = time.perf_counter() - start
+    start = time.perf_counter()
+    list(iter_near_expiry_moves(inv, demand))[-100:]
+    print(f"📄 last page      resumed {resumed*1000:8.1f} ms | offset skip {(time.perf_counter() - start)*1000:8.1f} ms")
@@ -1,14 +1,20 @@
 import tempfile
-from gtts import gTTS
-from faster_whisper import WhisperModel
 import os
+from functools import lru_cache
+
+from .warmup import warm_up as _warm_up
 
 # Defaults from env (but can override in app)
 WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "tiny")
 WHISPER_LANG = os.getenv("WHISPER_LANG", "en")
 
+# faster_whisper (ctranslate2) and gTTS are imported on first use, so importing
+# this module stays cheap for callers that never touch voice features.
+
 # ---- Speech-to-Text ----
+@lru_cache(maxsize=2)
 def load_whisper(model_size: str = WHISPER_MODEL_SIZE):
+    from faster_whisper import WhisperModel
     return WhisperModel(model_size, device="cpu", compute_type="int8")
 
 def transcribe_audio_bytes(wav_bytes: bytes, language: str = WHISPER_LANG) -> str:
@@ -21,11 +27,21 @@ def transcribe_audio_bytes(wav_bytes: bytes, language: str = WHISPER_LANG) -> st
     return "".join(segment.text for segment in segments).strip()
 
 # ---- Text-to-Speech ----
+def load_tts():
+    from gtts import gTTS
+    return gTTS
+
 def speak_text_to_audio_bytes(text: str, lang: str = "en"):
     if not text.strip():
         return None
+    gTTS = load_tts()
     with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp:
         tts = gTTS(text=text, lang=lang)
         tts.save(tmp.name)
         with open(tmp.name, "rb") as f:
             return f.read()
+
+# ---- Warm-up ----
+def warm_up(background: bool = True):
+    """Load the Whisper model and gTTS ahead of the first voice request."""
+    return _warm_up(load_whisper, load_tts, background=background)
@@ -0,0 +1,26 @@
+import os
+import threading
+from typing import Callable, Optional
+
+# Set WARMUP_ON_STARTUP=1 to preload lazily imported dependencies (Whisper,
+# gTTS, Groq, pandas-backed services) in a background thread at startup.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "0") == "1"
+
+def warm_up(*loaders: Callable[[], object], background: bool = True) -> Optional[threading.Thread]:
+    """Call each loader once so its imports/models are cached before first use.
+    Failures are ignored here; the real call will surface them.
+    Returns the started thread when background=True, else None.
+    """
+    def _run():
+        for load in loaders:
+            try:
+                load()
+            except Exception:
+                pass
+
+    if not background:
+        _run()
+        return None
+    thread = threading.Thread(target=_run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
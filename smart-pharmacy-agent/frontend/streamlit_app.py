@@ -8,12 +8,15 @@ import sys, os
 # Add root dir so "backend" can be imported
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from backend.services.forecasting import compute_forecast
+from backend.services.forecasting import auto_forecast
 from backend.services.groq_agent import forecast_with_groq, explain_reorder, chat_with_groq
 from backend.services.reorder import reorder_point, reorder_suggestion
 from backend.services.redistribution import near_expiry_redistribution
 from backend.services.routing import nearest_neighbor_route, build_stops_from_moves
+from backend.services.chat_router import InventoryIndex, ChatRouter
 from backend.services.voice import transcribe_audio_bytes, speak_text_to_audio_bytes, WHISPER_LANG
+from backend.services.voice import warm_up as warm_up_voice
+from backend.services.warmup import WARMUP_ON_STARTUP
 
 DATA_DIR = Path(__file__).resolve().parents[1] / 'data'
 
@@ -22,11 +25,25 @@ st.title('💊 Smart Pharmacy Inventory Agent')
 
 st.caption('Upload/inspect data → Forecast → Reorder alerts → Redistribution → Route planning')
 
+# Whisper/gTTS load lazily on first voice request; optionally preload them in the
+# background once per server process so the first transcription is fast.
+@st.cache_resource
+def start_voice_warm_up():
+    return warm_up_voice(background=True)
+
+if WARMUP_ON_STARTUP:
+    start_voice_warm_up()
+
 # Load sample data
 inv = pd.read_csv(DATA_DIR / 'sample_inventory.csv', parse_dates=['expiry_date'])
 centers = pd.read_csv(DATA_DIR / 'centers.csv')
 hist = pd.read_csv(DATA_DIR / 'demand_signals.csv')
 
+# One local forecast run per horizon, shared by the forecast, redistribution and chat tabs
+@st.cache_data
+def local_forecasts(hist: pd.DataFrame, horizon: int):
+    return auto_forecast(hist, horizon=horizon)
+
 tab1, tab2, tab3, tab4, tab5 = st.tabs(
     ['Inventory', 'Forecast & Reorder', 'Redistribution', 'Route Optimization', 'Chat & Voice']
 )
@@ -40,16 +57,20 @@ with tab1:
 with tab2:
     st.subheader('7-day Forecast & Reorder Suggestions')
     horizon = st.slider('Forecast horizon (days)', 3, 21, 7)
-    use_groq = st.toggle('Use Groq LLM for forecasting', value=True)
-    explain = st.toggle('Show AI Explanations', value=True)
+    use_groq = st.toggle('Use Groq LLM for forecasting', value=False)
+    # One Groq call per row, so explanations are opt-in rather than part of the first render
+    explain = st.toggle('Show AI Explanations', value=False)
     service = st.slider('Service level', 0.85, 0.99, 0.95, 0.01)
+    # Local path: best of Croston/TSB/Holt-Winters/moving median per series, all series at once
+    local_fc, local_model = ({}, {}) if use_groq else local_forecasts(hist, horizon)
     rows = []
     for _, row in inv.iterrows():
+        key = (row.center_id, row.drug)
         if use_groq:
             hist_series = list(hist[(hist.center_id==row.center_id)&(hist.drug==row.drug)].qty.tail(30))
             fc = np.array(forecast_with_groq(hist_series, horizon=horizon, drug=row.drug))
         else:
-            fc = compute_forecast(hist, row.center_id, row.drug, horizon=horizon)
+            fc = local_fc.get(key, np.zeros(horizon))
         rpoint = reorder_point(row.avg_daily_demand, int(row.lead_time_days), service_level=service, safety_stock=row.safety_stock)
         order_qty = reorder_suggestion(row.stock, rpoint)
 
@@ -68,6 +89,7 @@ with tab2:
             'reorder_point': round(rpoint,2),
             'suggest_order_qty': int(order_qty),
             'forecast_sum': round(float(np.sum(fc)),2),
+            'model': 'groq' if use_groq else local_model.get(key, 'none'),
             'explanation': explanation
         })
     out = pd.DataFrame(rows).sort_values(['suggest_order_qty','forecast_sum'], ascending=False)
@@ -77,10 +99,7 @@ with tab2:
 # ------------------ TAB 3 ------------------
 with tab3:
     st.subheader('Near-Expiry Redistribution (<=30 days)')
-    demand = {}
-    for _, row in inv.iterrows():
-        fc = compute_forecast(hist, row.center_id, row.drug, horizon=7)
-        demand[(row.center_id, row.drug)] = fc
+    demand, _ = local_forecasts(hist, 7)
     moves = near_expiry_redistribution(inv[['center_id','drug','stock','expiry_date']], demand, horizon=7, expiry_days=30)
     if moves.empty:
         st.success('No redistribution needed 👌')
@@ -179,6 +198,15 @@ with tab5:
     if 'messages' not in st.session_state:
         st.session_state.messages = []
 
+    # Common inventory questions are answered locally; open-ended ones go to Groq
+    if 'chat_router' not in st.session_state:
+        st.session_state.chat_router = ChatRouter(
+            InventoryIndex(inv, hist, centers, forecasts=local_forecasts(hist, 7)[0]), chat_with_groq)
+    chat_router = st.session_state.chat_router
+
+    with st.expander('Assistant stats'):
+        st.json(chat_router.summary())
+
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
@@ -203,13 +231,12 @@ with tab5:
 
                     # Get assistant reply immediately
                     with st.chat_message("assistant"):
-                        low_stock_items = inv[inv['stock'] < (inv['avg_daily_demand'] * 7)]['drug'].tolist()
-                        context_summary = f"Inventory highlights: Low stock (<1 week) for: {', '.join(low_stock_items) if low_stock_items else 'None'}\nAvailable centers: {', '.join(centers['name'].tolist())}\nUse this data to answer queries about stock, forecasts, etc."
-
                         try:
                             with st.spinner('Generating response...'):
-                                response = chat_with_groq(text_from_voice, context_summary)
+                                result = chat_router.answer(text_from_voice)
+                            response = result["answer"]
                             st.markdown(response)
+                            st.caption(f"{result['source']} · {result['latency_ms']:.0f} ms")
                             st.session_state.messages.append({"role": "assistant", "content": response})
 
                             # Auto speak response
@@ -231,13 +258,12 @@ with tab5:
             st.markdown(prompt)
 
         with st.chat_message("assistant"):
-            low_stock_items = inv[inv['stock'] < (inv['avg_daily_demand'] * 7)]['drug'].tolist()
-            context_summary = f"Inventory highlights: Low stock (<1 week) for: {', '.join(low_stock_items) if low_stock_items else 'None'}\nAvailable centers: {', '.join(centers['name'].tolist())}\nUse this data to answer queries about stock, forecasts, etc."
-
             try:
                 with st.spinner('Generating response...'):
-                    response = chat_with_groq(prompt, context_summary)
+                    result = chat_router.answer(prompt)
+                response = result["answer"]
                 st.markdown(response)
+                st.caption(f"{result['source']} · {result['latency_ms']:.0f} ms")
                 st.session_state.messages.append({"role": "assistant", "content": response})
             except Exception as e:
                 error_msg = f"Error generating response: {str(e)}"